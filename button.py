@@ -1,4 +1,6 @@
 class Button():
+	__slots__ = ('image', 'x_pos', 'y_pos', 'font', 'base_color', 'hovering_color', 'text_input', 'text', 'rect', 'text_rect')
+
 	def __init__(self, image, pos, text_input, font, base_color, hovering_color):
 		self.image = image
 		self.x_pos = pos[0]
@@ -5,27 +5,77 @@ from minesweeperAI import *
 from time import sleep
 from button import Button
 import sys
+import os
+import functools
+import random
+import shelve
+from multiprocessing import Pool
+
+# Analysis mode (parameters given) plays headless games: never open an SDL window,
+# and leave SIGINT/SIGTERM to Python so worker processes can be stopped
+if len(sys.argv) > 1:
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_NO_SIGNAL_HANDLERS'] = '1'
 
 pygame.init()
 
-SCREEN = pygame.display.set_mode((1280, 720))
 pygame.display.set_caption(settings.TITLE)
 
+# Window size of the menus
+MENU_SIZE = (1280, 720)
+
+def menu_screen():
+    '''Return the window at the menus' size, opening it on first use.'''
+    screen = pygame.display.get_surface()
+    if screen is None or screen.get_size() != MENU_SIZE:
+        screen = pygame.display.set_mode(MENU_SIZE)
+    return screen
+
+@functools.lru_cache(maxsize = None)
+def _load_image(path):
+    '''Load an image once, converted to the display's pixel format (the display must be set).'''
+    return pygame.image.load(path).convert_alpha()
+
 class Minesweeper:
     '''Class for running Minesweeper game.'''
-    def __init__(self):
-        self.screen = pygame.display.set_mode((settings.WIDTH, settings.HEIGHT))
+    __slots__ = ('config', 'screen', 'clock', 'win', 'board', 'playing')
+    
+    def __init__(self, config = settings.DEFAULT_CONFIG, display = True):
+        # Board size and number of mines of every game
+        self.config = config
+        
+        # Games that are never displayed (analysis) do not open a window
+        self.screen = None
+        if display:
+            self.screen = pygame.display.get_surface()
+            if self.screen is None or self.screen.get_size() != (config.width, config.height):
+                self.screen = pygame.display.set_mode((config.width, config.height))
         self.clock = pygame.time.Clock()
         
+        # Only quit, key, click and expose events are handled: drop the others (mouse motion...) in SDL
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.VIDEOEXPOSE])
+
         # Game result
         self.win = None
+        
+        # Board of the current game, reused by the following games
+        self.board = None
 
-    def new_game(self):
+    def new_game(self, rng = random):
         '''Start a new game.'''
-        self.board = Board()
+        if self.board is None:
+            self.board = Board(self.config, rng)
+        else:
+            self.board.reset_in_place(rng)
 
     def run_game(self, ai = None, automated = False, end_screen = True, display = True):
         '''Run the game and print its state on the screen.'''
+        # Automated games that are not displayed skip the event loop entirely
+        if automated and not display:
+            self.run_benchmark(ai)
+            return
+
         self.playing = True
         
         while self.playing:
@@ -40,16 +90,30 @@ class Minesweeper:
             if automated:
                 for event in pygame.event.get():
                     self.check_quit(event)
+                    self.check_expose(event)
+        
+        print('You won!' if self.win else 'You lost!')
                 
         # Immediately start new game after finishing previous one
         if end_screen:        
             self.end_screen()
 
+    def run_benchmark(self, ai):
+        '''Let the agent play the game without pygame: no drawing, clock ticks or event polling.'''
+        self.playing = True
+
+        while self.playing:
+            (mx, my), button = ai.make_move()
+            self.check_button(button, mx, my, ai = ai)
+
+            if self.check_win():
+                self.win = True
+                self.playing = False
+
     def draw(self):
         '''Print game state on the screen.''' 
-        self.screen.fill(settings.BGCOLOR)
-        self.board.draw(self.screen)
-        pygame.display.flip()
+        # The board covers the whole window: only the tiles that changed are updated
+        pygame.display.update(self.board.draw(self.screen))
         
     def check_button(self, button, mx, my, ai = None):
         '''Check clicked button and the game's state after the click.'''
@@ -64,34 +128,18 @@ class Minesweeper:
                 # dig and check if exploded
                 if not self.board.dig(mx, my, ai = ai):
                     # explode and reveal all mines (and wrong flags)
-                    for row in self.board.board_list:
-                        for tile in row:
-                            if tile.flagged and tile.type != "X":
-                                tile.flagged = False
-                                tile.revealed = True
-                                tile.image = settings.tile_not_mine
-                                
-                            elif tile.type == "X":
-                                tile.revealed = True
-                                
-                        self.playing = False    
-                    
+                    self.board.reveal_mines()
+                    self.playing = False
                     self.win = False
-                    print('You lost!')
                     
         if button == 3:
             # Right click to flag/unflag
-            if not self.board.board_list[mx][my].revealed:
-                self.board.board_list[mx][my].flagged = not self.board.board_list[mx][my].flagged
+            self.board.toggle_flag(mx, my)
 
     def check_win(self):
         '''Check win conditions.'''
-        for row in self.board.board_list:
-            for tile in row:
-                # Check whether if all tiles (not mines) are dug or flagged
-                if tile.type != 'X' and not tile.revealed:
-                    return False
-        return True
+        # Check whether if all tiles (not mines) are dug
+        return self.board.unrevealed_safe == 0
     
     def check_quit(self, event):
         '''Check if the user want to quit the game.'''
@@ -101,8 +149,12 @@ class Minesweeper:
             
         if event.type == pygame.KEYDOWN: # ESC to return to main menu
             if event.key == pygame.K_ESCAPE:
-                SCREEN = pygame.display.set_mode((1280, 720))
                 main_menu()
+                
+    def check_expose(self, event):
+        '''Draw the whole board again if the window was covered or minimised.'''
+        if event.type == pygame.VIDEOEXPOSE:
+            self.board.redraw = True
 
     def events(self, ai = None, automated = False):
         '''Handle game events.'''
@@ -121,97 +173,166 @@ class Minesweeper:
                         self.check_button(button, mx, my, ai = ai)
                         
                     self.check_quit(event)
+                    self.check_expose(event)
         
         # If no agent available: Play the game as normal
         else:
             for event in pygame.event.get():
                 if event.type == pygame.MOUSEBUTTONDOWN:
-                    mx, my = pygame.mouse.get_pos()
-                    mx //= settings.TILESIZE
-                    my //= settings.TILESIZE
-                    self.check_button(event.button, mx, my)
+                    # tile under the click
+                    mx, my = event.pos
+                    self.check_button(event.button, mx // self.config.tile_size, my // self.config.tile_size)
                     
                 self.check_quit(event)
+                self.check_expose(event)
         
         # Check win condition
         if self.check_win():
             self.win = True
             self.playing = False
             
-            for row in self.board.board_list:
-                for tile in row:
-                    # flagged all mines when won
-                    if not tile.revealed:
-                        tile.flagged = True
-                        
-            print('You won!')
+            # flagged all mines when won (the only tiles left unrevealed)
+            self.board.flag_mines()
                 
     def end_screen(self):
         '''Check user's action: quit the game or start a new game.'''
         while True:
             for event in pygame.event.get():
                 self.check_quit(event)
+                self.check_expose(event)
                 
                 # left click to restart
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     return
+            
+            # the game loop no longer draws the board
+            if self.board.redraw:
+                self.draw()
+
+
+# Solver constructor of every agent type, called with (cols, rows, amount_mines, guess_method, print_progress)
+_SOLVER_FACTORIES = {
+    1: lambda cols, rows, mines, guess_method, print_progress: GenerateConfigurationSolver(cols, rows, mines, print_progress = print_progress),
+    2: lambda cols, rows, mines, guess_method, print_progress: ProbabilityTheorySolver(cols, rows, mines, print_progress = print_progress),
+    3: lambda cols, rows, mines, guess_method, print_progress: SetBasedSolver(cols, rows, mines, guess_method, print_progress = print_progress),
+}
+
+def make_solver(agent_type, guess_method = 1, print_progress = False, config = settings.DEFAULT_CONFIG):
+    '''Create the solver of an agent type for a game configuration.'''
+    return _SOLVER_FACTORIES[agent_type](config.cols, config.rows, config.mines, guess_method, print_progress)
+
+def play_solver(config, agent_type, guess_method = 1):
+    '''Let the solver of an agent type play games on screen until the user quits.'''
+    minesweeper = Minesweeper(config)
+    ai = make_solver(agent_type, guess_method, print_progress = True, config = config)
+    while True:
+        minesweeper.new_game()
+        minesweeper.run_game(ai, automated = True, end_screen=True)
+        ai.reset()
+
+
+# File storing the results of games played by play_multiple_games, keyed by game seed
+RESULTS_CACHE = 'results_cache'
+
+# Version of the stored results: bump it whenever a change makes the same seed give another result
+# (mine placement or solver behaviour), results stored by an older version are then played again
+CACHE_VERSION = 3
+
+# Game and solver reused by every game a play_multiple_games worker process plays
+_worker_game = None
+_worker_ai = None
 
+def _init_worker(config, agent_type, guess_method):
+    '''Create the game and the solver of a worker process.'''
+    global _worker_game, _worker_ai
+    _worker_game = Minesweeper(config, display = False)
+    _worker_ai = make_solver(agent_type, guess_method, config = config)
 
-def play_multiple_games(agent_type, iter, guess_method = 1):
-    '''Perform multiple games and record AI agents' perfomance.'''
+def _run_one_game(seed):
+    '''Play the game of a seed in a worker process, return the seed and the game's (win, guess).'''
+    _worker_game.new_game(random.Random(seed))
+    _worker_game.run_benchmark(_worker_ai)
+    
+    guess = _worker_ai.guess
+    _worker_ai.reset()
+    return seed, (_worker_game.win, guess)
+
+def _game_results(config, agent_type, iter, guess_method, batch, cache):
+    '''Yield (win, guess) of every game: from the cache if it was already played, else from the workers.'''
+    # Game number n is always played with the same seed, hence the same mines
+    missing = {}
+    for game in range(1, iter + 1):
+        seed = hash((agent_type, guess_method, game))
+        key = '%d %d %d %d %d %d %d' % (CACHE_VERSION, config.cols, config.rows, config.mines, agent_type, guess_method, seed)
+        
+        if key in cache:
+            yield cache[key]
+        else:
+            missing[seed] = key
+            
+    if not missing:
+        return
+    
+    # Workers receive games in batches and play them back to back on their own game and solver
+    # (batches are smaller when there are too few games to give every CPU core one)
+    cores = os.cpu_count() or 1
+    chunksize = min(batch, max(1, -(-len(missing) // cores)))
+    with Pool(cores, initializer = _init_worker, initargs = (config, agent_type, guess_method)) as pool:
+        for seed, result in pool.imap_unordered(_run_one_game, missing, chunksize = chunksize):
+            cache[missing[seed]] = result
+            yield result
+
+def play_multiple_games(agent_type, iter, guess_method = 1, batch = 64, report_every = None, config = settings.DEFAULT_CONFIG):
+    '''Perform multiple games on every CPU core (batch games at a time) and record AI agents' perfomance.'''
+    # Print the summary about 200 times in a run (and after the last game)
+    if report_every is None:
+        report_every = max(1, iter // 200)
+    
     win = 0
     lose = 0
     guess = 0
     win_guess = 0
-    minesweeper = Minesweeper()
-    
-    if agent_type == 1:
-        ai = GenerateConfigurationSolver(settings.COLS, settings.ROWS, settings.AMOUNT_MINES, print_progress = False)
-    elif agent_type == 2:
-        ai = ProbabilityTheorySolver(settings.COLS, settings.ROWS, settings.AMOUNT_MINES, print_progress = False)
-    elif agent_type == 3:
-        ai = SetBasedSolver(settings.COLS, settings.ROWS, settings.AMOUNT_MINES, guess_method, print_progress = False)
     
-    for game in range(1, iter + 1):
-        minesweeper.new_game()
-        minesweeper.run_game(ai = ai, automated = True, end_screen = False, display = False)
-        
-        if minesweeper.win:
-            win += 1
-            win_guess += ai.guess
-        else:
-            lose += 1
+    with shelve.open(RESULTS_CACHE) as cache:
+        for game, (game_win, game_guess) in enumerate(_game_results(config, agent_type, iter, guess_method, batch, cache), 1):
+            if game_win:
+                win += 1
+                win_guess += game_guess
+            else:
+                lose += 1
+                
+            guess += game_guess
             
-        guess += ai.guess
-        
-        print('Total number of games: %d' % game)
-        print('Win: %d' % win)
-        print('Lose: %d' % lose)
-        print('Win percentage: %.4f' % (win / game))
-        print('Average guess: %.3f' % (guess / game))
-        if win > 0:
-            print('Average guess when won: %.3f' % (win_guess / win))
-        print('------------------------')
-        
-        if ai != None:
-            ai.reset()
+            if game % report_every != 0 and game != iter:
+                continue
+            
+            print('Total number of games: %d' % game)
+            print('Win: %d' % win)
+            print('Lose: %d' % lose)
+            print('Win percentage: %.4f' % (win / game))
+            print('Average guess: %.3f' % (guess / game))
+            if win > 0:
+                print('Average guess when won: %.3f' % (win_guess / win))
+            print('------------------------')
             
 def main_menu():
     '''Main menu screen.'''
+    SCREEN = menu_screen()
+    
+    # Texts, images and buttons are created once, not on every frame
+    MENU_TEXT = settings.get_font(100).render("MINESWEEPER", True, "#b68f40")
+    MENU_RECT = MENU_TEXT.get_rect(center=(640, 100))
+
+    PLAY_BUTTON = Button(image=_load_image("assets/Play Rect.png"), pos=(640, 300), 
+                        text_input="PLAY", font=settings.get_font(75), base_color="#d7fcd4", hovering_color="White")
+    QUIT_BUTTON = Button(image=_load_image("assets/Quit Rect.png"), pos=(640, 500), 
+                        text_input="QUIT", font=settings.get_font(75), base_color="#d7fcd4", hovering_color="White")
+    
     while True:
-        SCREEN.blit(settings.BG, (0, 0))
+        SCREEN.blit(settings.load_background(), (0, 0))
 
         MENU_MOUSE_POS = pygame.mouse.get_pos()
 
-        MENU_TEXT = settings.get_font(100).render("MINESWEEPER", True, "#b68f40")
-        MENU_RECT = MENU_TEXT.get_rect(center=(640, 100))
-
-        
-        PLAY_BUTTON = Button(image=pygame.image.load("assets/Play Rect.png"), pos=(640, 300), 
-                            text_input="PLAY", font=settings.get_font(75), base_color="#d7fcd4", hovering_color="White")
-        QUIT_BUTTON = Button(image=pygame.image.load("assets/Quit Rect.png"), pos=(640, 500), 
-                            text_input="QUIT", font=settings.get_font(75), base_color="#d7fcd4", hovering_color="White")
-
         SCREEN.blit(MENU_TEXT, MENU_RECT)
 
         for button in [PLAY_BUTTON, QUIT_BUTTON]:
@@ -233,39 +354,30 @@ def main_menu():
 
 def choose_difficulty():
     '''Choose Minesweeper game's difficulty.'''
+    SCREEN = menu_screen()
+    
+    # Texts and buttons are created once, not on every frame
+    DIFF_TEXT = settings.get_font(50).render("CHOOSE DIFFICULTY", True, "White")
+    DIFF_RECT = DIFF_TEXT.get_rect(center=(640, 100))
+
+    BACK = Button(image=None, pos=(640, 600), 
+                        text_input="BACK", font=settings.get_font(50), base_color="White", hovering_color="Green")
+    BEGINNER = Button(image=None, pos=(640, 260), 
+                        text_input="Beginner", font=settings.get_font(45), base_color="White", hovering_color="Green")
+    INTER = Button(image=None, pos=(640, 360), 
+                        text_input="Intermediate", font=settings.get_font(45), base_color="White", hovering_color="Green")
+    EXPERT = Button(image=None, pos=(640, 460), 
+                        text_input="Expert", font=settings.get_font(45), base_color="White", hovering_color="Green")
+    
     while True:
         PLAY_MOUSE_POS = pygame.mouse.get_pos()
 
-        SCREEN.blit(settings.BG, (0, 0))
-
-        DIFF_TEXT = settings.get_font(50).render("CHOOSE DIFFICULTY", True, "White")
-        DIFF_RECT = DIFF_TEXT.get_rect(center=(640, 100))
+        SCREEN.blit(settings.load_background(), (0, 0))
         SCREEN.blit(DIFF_TEXT, DIFF_RECT)
 
-        BACK = Button(image=None, pos=(640, 600), 
-                            text_input="BACK", font=settings.get_font(50), base_color="White", hovering_color="Green")
-
-        BACK.changeColor(PLAY_MOUSE_POS)
-        BACK.update(SCREEN)
-
-        BEGINNER = Button(image=None, pos=(640, 260), 
-                            text_input="Beginner", font=settings.get_font(45), base_color="White", hovering_color="Green")
-
-        BEGINNER.changeColor(PLAY_MOUSE_POS)
-        BEGINNER.update(SCREEN)
-
-
-        INTER = Button(image=None, pos=(640, 360), 
-                            text_input="Intermediate", font=settings.get_font(45), base_color="White", hovering_color="Green")
-
-        INTER.changeColor(PLAY_MOUSE_POS)
-        INTER.update(SCREEN)
-
-        EXPERT = Button(image=None, pos=(640, 460), 
-                            text_input="Expert", font=settings.get_font(45), base_color="White", hovering_color="Green")
-
-        EXPERT.changeColor(PLAY_MOUSE_POS)
-        EXPERT.update(SCREEN)
+        for button in [BACK, BEGINNER, INTER, EXPERT]:
+            button.changeColor(PLAY_MOUSE_POS)
+            button.update(SCREEN)
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -274,60 +386,44 @@ def choose_difficulty():
                 
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 if BEGINNER.checkForInput(PLAY_MOUSE_POS):
-                    settings.difficulty_settings(1)
-                    choose_solver()
+                    choose_solver(settings.make_config(1))
                 if INTER.checkForInput(PLAY_MOUSE_POS):
-                    settings.difficulty_settings(2)
-                    choose_solver()
+                    choose_solver(settings.make_config(2))
                 if EXPERT.checkForInput(PLAY_MOUSE_POS):
-                    settings.difficulty_settings(3)
-                    choose_solver()
+                    choose_solver(settings.make_config(3))
                 if BACK.checkForInput(PLAY_MOUSE_POS):
                     main_menu()
                     
         pygame.display.update()
         
-def choose_solver():
-    '''Choose Solver to play Minesweeper.'''
+def choose_solver(config):
+    '''Choose Solver to play Minesweeper with a game configuration.'''
+    SCREEN = menu_screen()
+    
+    # Texts and buttons are created once, not on every frame
+    SOLV_TEXT = settings.get_font(55).render("CHOOSE SOLVER", True, "White")
+    SOLV_RECT = SOLV_TEXT.get_rect(center=(640, 100))
+
+    BACK = Button(image=None, pos=(640, 600), 
+                        text_input="BACK", font=settings.get_font(50), base_color="White", hovering_color="Green")
+    NO_AI = Button(image=None, pos=(640, 200), 
+                        text_input="None", font=settings.get_font(45), base_color="White", hovering_color="Green")
+    GEN_CON = Button(image=None, pos=(640, 300), 
+                        text_input="Generate Configuration Solver", font=settings.get_font(40), base_color="White", hovering_color="Green")
+    PROB = Button(image=None, pos=(640, 400), 
+                        text_input="Probability Theory Solver", font=settings.get_font(40), base_color="White", hovering_color="Green")
+    SETB = Button(image=None, pos=(640, 500), 
+                        text_input="Set Based Solver", font=settings.get_font(40), base_color="White", hovering_color="Green")
+    
     while True:
         PLAY_MOUSE_POS = pygame.mouse.get_pos()
 
-        SCREEN.blit(settings.BG, (0, 0))
-
-        SOLV_TEXT = settings.get_font(55).render("CHOOSE SOLVER", True, "White")
-        SOLV_RECT = SOLV_TEXT.get_rect(center=(640, 100))
+        SCREEN.blit(settings.load_background(), (0, 0))
         SCREEN.blit(SOLV_TEXT, SOLV_RECT)
 
-        BACK = Button(image=None, pos=(640, 600), 
-                            text_input="BACK", font=settings.get_font(50), base_color="White", hovering_color="Green")
-
-        BACK.changeColor(PLAY_MOUSE_POS)
-        BACK.update(SCREEN)
-
-        NO_AI = Button(image=None, pos=(640, 200), 
-                            text_input="None", font=settings.get_font(45), base_color="White", hovering_color="Green")
-
-        NO_AI.changeColor(PLAY_MOUSE_POS)
-        NO_AI.update(SCREEN)
-
-
-        GEN_CON = Button(image=None, pos=(640, 300), 
-                            text_input="Generate Configuration Solver", font=settings.get_font(40), base_color="White", hovering_color="Green")
-
-        GEN_CON.changeColor(PLAY_MOUSE_POS)
-        GEN_CON.update(SCREEN)
-
-        PROB = Button(image=None, pos=(640, 400), 
-                            text_input="Probability Theory Solver", font=settings.get_font(40), base_color="White", hovering_color="Green")
-
-        PROB.changeColor(PLAY_MOUSE_POS)
-        PROB.update(SCREEN)
-
-        SETB = Button(image=None, pos=(640, 500), 
-                            text_input="Set Based Solver", font=settings.get_font(40), base_color="White", hovering_color="Green")
-
-        SETB.changeColor(PLAY_MOUSE_POS)
-        SETB.update(SCREEN)
+        for button in [BACK, NO_AI, GEN_CON, PROB, SETB]:
+            button.changeColor(PLAY_MOUSE_POS)
+            button.update(SCREEN)
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -336,63 +432,49 @@ def choose_solver():
                 
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 if NO_AI.checkForInput(PLAY_MOUSE_POS):
-                    minesweeper = Minesweeper()
+                    minesweeper = Minesweeper(config)
                     while True:
                         minesweeper.new_game()
                         minesweeper.run_game()
                         
                 if GEN_CON.checkForInput(PLAY_MOUSE_POS):
-                    minesweeper = Minesweeper()
-                    ai = GenerateConfigurationSolver(settings.COLS, settings.ROWS, settings.AMOUNT_MINES, print_progress = True)
-                    while True:
-                        minesweeper.new_game()
-                        minesweeper.run_game(ai, automated = True, end_screen=True)
-                        ai.reset()
+                    play_solver(config, 1)
                         
                 if PROB.checkForInput(PLAY_MOUSE_POS):
-                    minesweeper = Minesweeper()
-                    ai = ProbabilityTheorySolver(settings.COLS, settings.ROWS, settings.AMOUNT_MINES, print_progress = True)
-                    while True:
-                        minesweeper.new_game()
-                        minesweeper.run_game(ai, automated = True, end_screen=True)
-                        ai.reset()
+                    play_solver(config, 2)
                         
                 if SETB.checkForInput(PLAY_MOUSE_POS):
-                    choose_guess_method()
+                    choose_guess_method(config)
                     
                 if BACK.checkForInput(PLAY_MOUSE_POS):
                     choose_difficulty()
                     
         pygame.display.update()
 
-def choose_guess_method():
+def choose_guess_method(config):
     '''Choose method to perform uncertain move (only for SetBasedSolver).'''
+    SCREEN = menu_screen()
+    
+    # Texts and buttons are created once, not on every frame
+    SOLV_TEXT = settings.get_font(55).render("CHOOSE GUESS METHOD", True, "White")
+    SOLV_RECT = SOLV_TEXT.get_rect(center=(640, 100))
+
+    BACK = Button(image=None, pos=(640, 600), 
+                        text_input="BACK", font=settings.get_font(50), base_color="White", hovering_color="Green")
+    G_GENCON = Button(image=None, pos=(640, 300), 
+                        text_input="Generate Configuration", font=settings.get_font(45), base_color="White", hovering_color="Green")
+    G_PROB = Button(image=None, pos=(640, 400), 
+                        text_input="Probability Theory", font=settings.get_font(45), base_color="White", hovering_color="Green")
+    
     while True:
         PLAY_MOUSE_POS = pygame.mouse.get_pos()
 
-        SCREEN.blit(settings.BG, (0, 0))
-
-        SOLV_TEXT = settings.get_font(55).render("CHOOSE GUESS METHOD", True, "White")
-        SOLV_RECT = SOLV_TEXT.get_rect(center=(640, 100))
+        SCREEN.blit(settings.load_background(), (0, 0))
         SCREEN.blit(SOLV_TEXT, SOLV_RECT)
 
-        BACK = Button(image=None, pos=(640, 600), 
-                            text_input="BACK", font=settings.get_font(50), base_color="White", hovering_color="Green")
-
-        BACK.changeColor(PLAY_MOUSE_POS)
-        BACK.update(SCREEN)
-
-        G_GENCON = Button(image=None, pos=(640, 300), 
-                            text_input="Generate Configuration", font=settings.get_font(45), base_color="White", hovering_color="Green")
-
-        G_GENCON.changeColor(PLAY_MOUSE_POS)
-        G_GENCON.update(SCREEN)
-
-        G_PROB = Button(image=None, pos=(640, 400), 
-                            text_input="Probability Theory", font=settings.get_font(45), base_color="White", hovering_color="Green")
-
-        G_PROB.changeColor(PLAY_MOUSE_POS)
-        G_PROB.update(SCREEN)
+        for button in [BACK, G_GENCON, G_PROB]:
+            button.changeColor(PLAY_MOUSE_POS)
+            button.update(SCREEN)
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -401,23 +483,13 @@ def choose_guess_method():
                 
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 if G_GENCON.checkForInput(PLAY_MOUSE_POS):
-                    minesweeper = Minesweeper()
-                    ai = SetBasedSolver(settings.COLS, settings.ROWS, settings.AMOUNT_MINES, 1, print_progress=True)
-                    while True:
-                        minesweeper.new_game()
-                        minesweeper.run_game(ai, automated = True, end_screen=True)
-                        ai.reset()
+                    play_solver(config, 3, 1)
                         
                 if G_PROB.checkForInput(PLAY_MOUSE_POS):
-                    minesweeper = Minesweeper()
-                    ai = SetBasedSolver(settings.COLS, settings.ROWS, settings.AMOUNT_MINES, 2, print_progress=True)
-                    while True:
-                        minesweeper.new_game()
-                        minesweeper.run_game(ai, automated = True, end_screen=True)
-                        ai.reset()
+                    play_solver(config, 3, 2)
                         
                 if BACK.checkForInput(PLAY_MOUSE_POS):
-                    choose_solver()
+                    choose_solver(config)
                     
         pygame.display.update()
 
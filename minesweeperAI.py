@@ -1,3 +1,4 @@
+from collections import deque
 from itertools import combinations
 
 class Sentence():
@@ -6,12 +7,23 @@ class Sentence():
     Consist of two main components: a set of tile and the number of mines in it.
     Provide knowledge for Minesweeper solver to decide future moves.
     '''
-    def __init__(self, cells, count):
+    __slots__ = ('cells', 'count', '_mask', '_dirty', '_dead')
+    
+    def __init__(self, cells, count, mask = 0):
         # Set of cells
         self.cells = set(cells)
         
         # Number of mines in self.cells
         self.count = count
+        
+        # Bitmask of self.cells (the bit of every tile is given by the solver)
+        self._mask = mask
+        
+        # Changed since check_sentence last examined it
+        self._dirty = True
+        
+        # Replaced by another sentence, to be removed from the knowledge
+        self._dead = False
 
     def __eq__(self, other):
         '''Check equivalent sentences.'''
@@ -29,7 +41,7 @@ class Sentence():
         # If number of tiles = number or mines ==> all tiles are mines
         # else nothing can be inferred from the sentence
         if len(self.cells) == self.count:
-            return self.cells.copy()
+            return self.cells
         return set()
 
     def known_safes(self):
@@ -40,23 +52,35 @@ class Sentence():
         # If number of mines = 0 ==> all tiles are safe
         # else nothing can be inferred from the sentence
         if self.count == 0:
-            return self.cells.copy()
+            return self.cells
         return set()
 
-    def mark_mine(self, cell):
-        '''Mark tile as mine and remove it from the sentence.'''
+    def mark_mine(self, cell, bit = 0):
+        '''Mark tile as mine and remove it (and its bit in the mask) from the sentence.'''
         if cell in self.cells:
             self.cells.remove(cell)
             self.count -= 1
+            self._mask &= ~bit
+            self._dirty = True
 
-    def mark_safe(self, cell):
-        '''Mark tile as safe and remove it from the sentence.'''
+    def mark_safe(self, cell, bit = 0):
+        '''Mark tile as safe and remove it (and its bit in the mask) from the sentence.'''
         if cell in self.cells:
             self.cells.remove(cell)
+            self._mask &= ~bit
+            self._dirty = True
             
             
+def _scan_order(cell):
+    '''Sort key of tiles in the order of a scan over the board, row by row.'''
+    return cell[1], cell[0]
+    
+    
 class Solver():
     '''Base class for a Minesweeper solver.'''
+    __slots__ = ('width', 'height', 'amount_mines', 'moves_made', 'mines', 'safes', 'pending_safes', '_unflagged_mines',
+                 'unknown_cells', '_neighbours', '_cell_bit', 'knowledge', 'cell_to_sentences', 'next_uncertain_move',
+                 'print_progress', 'guess')
     
     def __init__(self, width, height, amount_mines, print_progress = True):
         # Set initial height and width and initial amount of mines
@@ -70,10 +94,31 @@ class Solver():
         # Keep track of cells known to be safe or mines
         self.mines = set()
         self.safes = set()
+        
+        # Safe cells that are not clicked on yet
+        self.pending_safes = set()
+        
+        # Mines that are not flagged yet
+        self._unflagged_mines = set()
+        
+        # Cells that are neither clicked on nor known to be mines
+        self.unknown_cells = {(x, y) for x in range(width) for y in range(height)}
+        
+        # Adjacent cells (inside the board) of every cell
+        self._neighbours = {(x, y): tuple((nx, ny) for nx in range(x - 1, x + 2) for ny in range(y - 1, y + 2)
+                                          if (nx, ny) != (x, y) and 0 <= nx < width and 0 <= ny < height)
+                            for x in range(width) for y in range(height)}
+        
+        # Bit of every cell in the bitmask of a sentence
+        self._cell_bit = {(x, y): 1 << (x * height + y) for x in range(width) for y in range(height)}
 
         # List of sentences about the game known to be true
         self.knowledge = []
         
+        # Index of the sentences containing every tile: tile -> {id of sentence: sentence}
+        # (dictionaries keep the sentences in the order they were indexed)
+        self.cell_to_sentences = {}
+        
         # Set next uncertain move to make
         self.next_uncertain_move = None
         
@@ -86,82 +131,145 @@ class Solver():
     def mark_mine(self, cell):
         '''Mark tile as mine and remove it from every sentence in the agent's knowledge.'''
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.unknown_cells.discard(cell)
+        if cell not in self.moves_made:
+            self._unflagged_mines.add(cell)
+        bit = self._cell_bit[cell]
+        for sentence in self.cell_to_sentences.pop(cell, {}).values():
+            sentence.mark_mine(cell, bit)
 
     def mark_safe(self, cell):
         '''Mark tile as safe and remove it from every sentence in the agent's knowledge.'''
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        if cell not in self.moves_made:
+            self.pending_safes.add(cell)
+        bit = self._cell_bit[cell]
+        for sentence in self.cell_to_sentences.pop(cell, {}).values():
+            sentence.mark_safe(cell, bit)
+            
+    def _index_sentence(self, sentence):
+        '''Add a sentence of the knowledge to the tile -> sentences index.'''
+        sentence_id = id(sentence)
+        for cell in sentence.cells:
+            self.cell_to_sentences.setdefault(cell, {})[sentence_id] = sentence
+            
+    def _unindex_sentence(self, sentence):
+        '''Remove a sentence leaving the knowledge from the tile -> sentences index.'''
+        sentence_id = id(sentence)
+        for cell in sentence.cells:
+            del self.cell_to_sentences[cell][sentence_id]
+            
+    def _subtract_sentence(self, s1, s2):
+        '''Remove the tiles and mines of s2 from s1 (s2's cells must be a subset of s1's).'''
+        sentence_id = id(s1)
+        for cell in s2.cells:
+            del self.cell_to_sentences[cell][sentence_id]
+            
+        s1.cells.difference_update(s2.cells)
+        s1.count -= s2.count
+        s1._mask &= ~s2._mask
+        s1._dirty = True
             
     def add_sentence(self, cell, count):
         '''
         Examine tile's neighbourhood and number of surrounding mines, 
         form new sentence and add it to the agent's knowledge.
+        Return False if the sentence is empty or already known (and is not added).
         '''
+        mines, safes, cell_bit = self.mines, self.safes, self._cell_bit
         cells = set()
-        for x in range(cell[0] - 1, cell[0] + 2):
-            for y in range(cell[1] - 1, cell[1] + 2):
-                if (x, y) == cell:
-                    continue
+        mask = 0
+        for neighbour in self._neighbours[cell]:
+            if neighbour in mines:
+                count -= 1
                 
-                if 0 <= x < self.width and 0 <= y < self.height:
-                    if (x, y) in self.mines:
-                        count -= 1
-                        
-                    else:
-                        if (x, y) not in self.safes:
-                           cells.add((x, y))
+            elif neighbour not in safes:
+                cells.add(neighbour)
+                mask |= cell_bit[neighbour]
+        
+        if len(cells) == 0:
+            return False
+        
+        # Equivalent sentences contain the same tiles: look for one among the sentences of any of them
+        for sentence in self.cell_to_sentences.get(next(iter(cells)), {}).values():
+            if sentence.count == count and sentence.cells == cells:
+                return False
                            
-        new_sentence = Sentence(cells, count)
+        new_sentence = Sentence(cells, count, mask)
         self.knowledge.append(new_sentence)
+        self._index_sentence(new_sentence)
+        return True
+        
+    def is_settled(self):
+        '''Check if no sentence changed since check_sentence last examined the knowledge.'''
+        return not any(sentence._dirty for sentence in self.knowledge)
         
     def remove_null_sentence(self):
         '''Remove sentence with the form: set() = 0 (contain no information)'''
-        for i in range(len(self.knowledge) - 1, -1, -1):
-            if len(self.knowledge[i].cells) == 0:
-                del self.knowledge[i]
+        for sentence in self.knowledge:
+            if len(sentence.cells) == 0:
+                self._unindex_sentence(sentence)
+                
+        self.knowledge[:] = [sentence for sentence in self.knowledge if len(sentence.cells) != 0]
   
     def remove_duplicated_sentence(self):
         '''Remove sentence that is equivalent to another one.'''
-        duplicated_sentence_pos = set()
-        
-        # Store the position of duplicated sentences
-        for i in range(len(self.knowledge) - 1):
-            for j in range(i + 1, len(self.knowledge)):
-                if self.knowledge[i] == self.knowledge[j]:
-                    duplicated_sentence_pos.add(j)
-        
-        # Remove duplicated sentences           
-        for pos in sorted(duplicated_sentence_pos, reverse = True):
-            del self.knowledge[pos]
+        # Group sentences by (number of tiles, mine count): the first sentence of a group is kept
+        # as is, and cell sets are only hashed once another sentence falls into the same group
+        groups = {}
+        unique_sentences = []
+        for sentence in self.knowledge:
+            key = (len(sentence.cells), sentence.count)
+            group = groups.get(key)
+            
+            if group is None:
+                groups[key] = sentence
+                
+            else:
+                if isinstance(group, Sentence):
+                    group = groups[key] = {frozenset(group.cells)}
+                
+                cells = frozenset(sentence.cells)
+                # Keep only the first of equivalent sentences
+                if cells in group:
+                    self._unindex_sentence(sentence)
+                    continue
+                group.add(cells)
+                
+            unique_sentences.append(sentence)
+            
+        self.knowledge[:] = unique_sentences
             
     def check_sentence(self):
         '''
         Traverse through every sentence, and mark any mines or safe tiles that can be
         identified from only the given sentence.
         '''
-        mark_cell = True
-        # The loop runs until there is no tile left to mark
-        while mark_cell:
-            mark_cell = False                 
-            safe_cell = set() 
-            mine_cell = set()
+        # Work queue of the sentences to examine
+        # (a sentence that has not changed since it was last checked gives nothing new)
+        queue = deque(sentence for sentence in self.knowledge if sentence._dirty)
+        queued = {id(sentence) for sentence in queue}
+        
+        # The loop runs until there is no sentence left to examine
+        while queue:
+            sentence = queue.popleft()
+            queued.discard(id(sentence))
+            sentence._dirty = False
             
             # Collect info about mines and safe tiles
-            for sentence in self.knowledge:
-                safe_cell.update(sentence.known_safes())
-                mine_cell.update(sentence.known_mines())
-                
-            # Mark safe tiles    
-            for cell in safe_cell:
-                mark_cell = True
-                self.mark_safe(cell)
-            # Mark mines    
-            for cell in mine_cell:
-                mark_cell = True
-                self.mark_mine(cell) 
+            # (copied: marking a tile removes it from the sentence)
+            safe_cell = list(sentence.known_safes())
+            mine_cell = list(sentence.known_mines())
+            
+            # Mark safe tiles and mines, only the sentences containing them have changed
+            for cells, mark in ((safe_cell, self.mark_safe), (mine_cell, self.mark_mine)):
+                for cell in cells:
+                    changed = self.cell_to_sentences.get(cell, {})
+                    mark(cell)
+                    for sentence_id, changed_sentence in changed.items():
+                        if sentence_id not in queued:
+                            queued.add(sentence_id)
+                            queue.append(changed_sentence)
             
     def print_sentence(self):
         '''Display agent's knowledge.'''
@@ -169,10 +277,54 @@ class Solver():
             for sentence in self.knowledge:
                 print(sentence)
             
+    def record_move(self, cell):
+        '''Mark a revealed tile as safe and record it as a move made.'''
+        self.moves_made.add(cell)
+        self.unknown_cells.discard(cell)
+        self.pending_safes.discard(cell)
+        self.mark_safe(cell)
+            
     def add_knowledge(self, cell, count):
         '''
         Make change to the agent's knowledge and exploit as much information as possible from every sentence, 
         as well as remove all unnecessary sentences for further guesses.
+        '''
+        # Mark previously revealed tile as safe and record new move
+        self.record_move(cell)
+        
+        if count == 0:
+            return
+        
+        # Add new sentence based on information about previous move
+        # (nothing to update if it is already known and no sentence changed since the last update)
+        if not self.add_sentence(cell, count) and self.is_settled():
+            return
+        
+        self.update_knowledge()
+        
+    def add_knowledge_batch(self, revealed):
+        '''
+        Add the information about every tile revealed by a move, given as (tile, number of adjacent mines) pairs.
+        The knowledge is updated once, after the sentences of all tiles are added.
+        '''
+        # Record every move first: the new sentences then only contain tiles that are still hidden
+        for cell, count in revealed:
+            self.record_move(cell)
+        
+        clue_found = False
+        sentence_added = False
+        for cell, count in revealed:
+            if count != 0:
+                clue_found = True
+                if self.add_sentence(cell, count):
+                    sentence_added = True
+        
+        if sentence_added or (clue_found and not self.is_settled()):
+            self.update_knowledge()
+    
+    def update_knowledge(self):
+        '''
+        Exploit as much information as possible from every sentence after new ones are added.
         This may add, remove, merge or perform other actions with sentences the knowledge base.
         '''
         return NotImplementedError
@@ -186,8 +338,7 @@ class Solver():
     
     def make_safe_move(self):
         '''Perform a safe move if available, or return None if no such move can be made.'''
-        allowed = list(self.safes.difference(self.moves_made))
-        return allowed[0] if len(allowed) > 0 else None
+        return next(iter(self.pending_safes), None)
     
     def choose_uncertain_move(self, best_informed_move, best_informed_move_risk, prob_dict):
         '''
@@ -207,21 +358,16 @@ class Solver():
         
         # else: a tile that does not appear in any sentences will be revealed
         else:
-            for y in range(self.height):
-                for x in range(self.width):
-                    if (x, y) not in self.moves_made and (x, y) not in prob_dict:
-                        self.next_uncertain_move = (x, y)
-                        return
+            outside_cells = self.unknown_cells.difference(prob_dict)
+            if outside_cells:
+                self.next_uncertain_move = min(outside_cells, key = _scan_order)
     
     
     def make_uncertain_move(self):
         '''Make uncertain move if all attempts for finding safe moves fail.'''
         # If the agent's knowledge is empty: traverses through the board until a hidden tile is found and returns it
-        if len(self.knowledge) == 0:
-            for y in range(self.height):
-                for x in range(self.width):
-                    if (x, y) not in self.moves_made and (x, y) not in self.mines:
-                        return (x, y)
+        if len(self.knowledge) == 0 and self.unknown_cells:
+            return min(self.unknown_cells, key = _scan_order)
                     
         # else return move with lowest risk after calculation            
         return self.next_uncertain_move
@@ -229,15 +375,15 @@ class Solver():
     def make_move(self):
         '''Making next move and display it on the screen.'''
         # Check if all mines are flagged and flag if one isn't
-        for mine in self.mines:
-            if mine not in self.moves_made:
-                self.moves_made.add(mine)
+        if self._unflagged_mines:
+            mine = self._unflagged_mines.pop()
+            self.moves_made.add(mine)
+            
+            if self.print_progress:
+                print("Flag mine: {}".format(mine))
+                print('---------------------')
                 
-                if self.print_progress:
-                    print("Flag mine: {}".format(mine))
-                    print('---------------------')
-                    
-                return mine, 3
+            return mine, 3
         
         # Perform a safe move if possible, or analyze knowledge base to find one
         if self.make_safe_move() == None:
@@ -269,31 +415,25 @@ class Solver():
         self.moves_made.clear()
         self.mines.clear()
         self.safes.clear()
+        self.pending_safes.clear()
+        self._unflagged_mines.clear()
+        self.unknown_cells = {(x, y) for x in range(self.width) for y in range(self.height)}
         self.knowledge.clear()
+        self.cell_to_sentences.clear()
         self.next_uncertain_move = None
         self.guess = -1
     
 
 class ProbabilitySolver(Solver):
     '''Solver that choose next move based on the probability of hitting mines of tiles.'''
-    def add_knowledge(self, cell, count):
+    __slots__ = ()
+    
+    def update_knowledge(self):
         '''
         Actions made:
-        1. Mark previously revealed tile as safe and record new move.
-        2. Add new sentence based on information about previous move.
-        3. Check if new mines/safe tiles can be identified from individual sentence.
-        4. Remove unnecessary sentence.
+        1. Check if new mines/safe tiles can be identified from individual sentence.
+        2. Remove unnecessary sentence.
         '''
-        # Mark previously revealed tile as safe and record new move
-        self.moves_made.add(cell)
-        self.mark_safe(cell)
-        
-        if count == 0:
-            return
-        
-        # Add new sentence based on information about previous move
-        self.add_sentence(cell, count)
-        
         # Check if new mines/safe tiles can be identified from individual sentence
         self.check_sentence()
         
@@ -304,11 +444,73 @@ class ProbabilitySolver(Solver):
         self.print_sentence()
 
         
+def _enumerate_configurations(sentences, num_bits):
+    '''
+    Enumerate all configurations (bitmasks of mines) that satisfy every sentence, given as (bitmask of tiles, mine count).
+    Return the number of configurations having a mine on each of the num_bits bits, and the number of configurations.
+    '''
+    # Generate all possible configurations        
+    given_configuration = []
+    possible_configuration = [0]
+    invalid_mask = 0
+    
+    # Algorithm based on breadth-first search to generate configuration
+    remaining_sentences = list(sentences)
+    while remaining_sentences:
+        given_configuration, possible_configuration = possible_configuration, given_configuration
+        possible_configuration.clear()
+        
+        # The most constrained sentence (fewest new tiles, then fewest mines) is considered next,
+        # so that configurations violating it are abandoned before they multiply
+        i = min(range(len(remaining_sentences)), 
+                key = lambda i: (bin(remaining_sentences[i][0] & ~invalid_mask).count("1"), remaining_sentences[i][1]))
+        sentence_mask, sentence_count = remaining_sentences.pop(i)
+        
+        new_mask = sentence_mask & ~invalid_mask
+        valid_bits = []
+        while new_mask:
+            lowest_bit = new_mask & -new_mask
+            valid_bits.append(lowest_bit)
+            new_mask ^= lowest_bit
+        
+        # Masks of every choice of k new tiles, computed once for each k
+        choice_masks = {}
+        
+        # Generate all configurations that satisfy first n sentence, based on a configuration that satisfy n - 1 first sentence
+        for configuration in given_configuration:
+            missing_cell_num = sentence_count - bin(configuration & sentence_mask).count("1")
+            
+            # Abandon configurations that have already violated n-th sentence if we cannot add tiles in it to generate a satisfied one
+            if missing_cell_num < 0:
+                continue
+            
+            # Add tile to configurations for feasible solutions    
+            else:
+                if missing_cell_num not in choice_masks:
+                    choice_masks[missing_cell_num] = [sum(choice) for choice in combinations(valid_bits, missing_cell_num)]
+                possible_configuration.extend([configuration | choice_mask for choice_mask in choice_masks[missing_cell_num]])
+        
+        # Tile that appeared in sentences cannot be added again when considering next ones         
+        invalid_mask |= sentence_mask
+        
+    # Record the number of appearances of every tile in every configuration
+    bit_histogram = [0] * num_bits
+    for configuration in possible_configuration:
+        while configuration:
+            lowest_bit = configuration & -configuration
+            bit_histogram[lowest_bit.bit_length() - 1] += 1
+            configuration ^= lowest_bit
+            
+    return bit_histogram, len(possible_configuration)
+
+
 class GenerateConfigurationSolver(ProbabilitySolver):
     '''
     Solver that calculate mines probability by enumerating all possible configurations
     that satisfy every sentence in knowledge base.
     '''
+    __slots__ = ()
+    
     def analyze_knowledge(self):
         '''
         Enumerating all possible configurations, and record the number of appearence
@@ -326,38 +528,44 @@ class GenerateConfigurationSolver(ProbabilitySolver):
             for cell in sentence.cells:
                 cell_histogram[cell] = 0
         
-        # Generate all possible configurations        
-        given_configuration = []
-        possible_configuration = [set()]
-        invalid_cell = set()
+        # Every tile is given a bit: a configuration is the bitmask of its mines
+        cell_bit = {cell: 1 << i for i, cell in enumerate(cell_histogram)}
         
-        # Algorithm based on breadth-first search to generate configuration
+        # (bitmask of tiles, mine count) of every sentence
+        sentences = []
         for sentence in self.knowledge:
-            given_configuration, possible_configuration = possible_configuration, given_configuration
-            possible_configuration.clear()
+            sentence_mask = 0
+            for cell in sentence.cells:
+                sentence_mask |= cell_bit[cell]
+            sentences.append((sentence_mask, sentence.count))
             
-            # Generate all configurations that satisfy first n sentence, based on a configuration that satisfy n - 1 first sentence
-            for configuration in given_configuration:
-                valid_cell = sentence.cells - invalid_cell
-                missing_cell_num = sentence.count - (len(sentence.cells & configuration))
-                
-                # Abandon configurations that have already violated n-th sentence if we cannot add tiles in it to generate a satisfied one
-                if missing_cell_num < 0:
-                    continue
-                
-                # Add tile to configurations for feasible solutions    
+        # Split sentences into components sharing no tile: (bitmask of tiles, sentences)
+        components = []
+        for sentence in sentences:
+            component_mask, component_sentences = sentence[0], [sentence]
+            unconnected = []
+            for other_mask, other_sentences in components:
+                if other_mask & component_mask:
+                    component_mask |= other_mask
+                    component_sentences += other_sentences
                 else:
-                    possible_missing_cell = combinations(valid_cell, missing_cell_num)
-                    for choice in possible_missing_cell:
-                        possible_configuration.append(configuration.union(choice))
-            
-            # Tile that appeared in sentences cannot be added again when considering next ones         
-            invalid_cell = invalid_cell | sentence.cells
+                    unconnected.append((other_mask, other_sentences))
+                    
+            unconnected.append((component_mask, component_sentences))
+            components = unconnected
+        
+        # Configurations of the whole knowledge are every combination of the components' ones,
+        # so components are enumerated independently and their counts multiplied
+        bit_histogram = [0] * len(cell_bit)
+        total_configuration = 1
+        for component_mask, component_sentences in components:
+            component_histogram, component_total = _enumerate_configurations(component_sentences, len(cell_bit))
+            for i in range(len(bit_histogram)):
+                bit_histogram[i] = bit_histogram[i] * component_total + component_histogram[i] * total_configuration
+            total_configuration *= component_total
             
-        # Record the number of appearances of every tile in every configuration
-        for configuration in possible_configuration:
-            for cell in configuration:
-                cell_histogram[cell] += 1
+        for i, cell in enumerate(cell_histogram):
+            cell_histogram[cell] = bit_histogram[i]
         
         # Check if any mines/safe tiles can be identified
         certain_move_found = False
@@ -366,28 +574,23 @@ class GenerateConfigurationSolver(ProbabilitySolver):
                 self.mark_safe(cell)
                 certain_move_found = True
                 
-            elif cell_histogram[cell] == len(possible_configuration):
+            elif cell_histogram[cell] == total_configuration:
                 self.mark_mine(cell)
         
         # else calculating move risk and decide the tile to reveal        
         if not certain_move_found:
             best_informed_move = min(cell_histogram, key = lambda cell: cell_histogram[cell])
-            best_informed_move_risk = cell_histogram[best_informed_move] / len(possible_configuration)
+            best_informed_move_risk = cell_histogram[best_informed_move] / total_configuration
             
             self.choose_uncertain_move(best_informed_move, best_informed_move_risk, cell_histogram)
             
 
-class Probability():
-    '''
-    Object storing mine probability of a tile.
-    '''
-    def __init__(self):
-        self.prob = 1
-
 class ProbabilityTheorySolver(ProbabilitySolver):
     '''
     Solver that calculate mines probability using probability theory.
     '''
+    __slots__ = ()
+    
     def analyze_knowledge(self):
         '''
         Estimating the probability of containing a mine of every tile using
@@ -399,21 +602,12 @@ class ProbabilityTheorySolver(ProbabilitySolver):
         if len(self.knowledge) == 0:
             return
         
-        # Creating a dictionary for storing tiles' mine probability
-        prob_dict = {}
-        for sentence in self.knowledge:
-            for cell in sentence.cells:
-                prob_dict[cell] = prob_dict.get(cell, Probability())
-        
-        # Creating a list for future probability calculation        
+        # Creating a dictionary for storing the index of every tile in the list of mine
+        # probabilities, and a list of (mine count, indices of its cells) of every sentence
+        # containing mines
+        cell_index = {}
+        probs = []
         constraint_list = []
-        for sentence in self.knowledge:
-            # Creating a list that store probability of cells in a sentence together
-            prob_constraint = []
-            for cell in sentence.cells:
-                prob_constraint.append(prob_dict[cell])
-            
-            constraint_list.append(prob_constraint)
         
         # Estimating mine probability
         # Formula: A = 1 - (1 - A1)(1 - A2)...(1 - An)
@@ -421,24 +615,40 @@ class ProbabilityTheorySolver(ProbabilitySolver):
         # Ai: mine probability of a tile considering only n-th sentence
         # (assume that all constraints are conditionally independent) 
         for sentence in self.knowledge:
+            # Creating a list that store the indices of cells in a sentence together
+            prob_constraint = []
+            for cell in sentence.cells:
+                if cell not in cell_index:
+                    cell_index[cell] = len(probs)
+                    probs.append(1.0)
+                prob_constraint.append(cell_index[cell])
+            
             if len(sentence.cells) != 0:
                 r = 1 - sentence.count / len(sentence.cells)
+                for j in prob_constraint:
+                    probs[j] *= r
+            
+            # Normalizing by a sentence without mines leaves probabilities unchanged
+            if sentence.count != 0:
+                constraint_list.append((sentence.count, prob_constraint))
                 
-            for cell in sentence.cells:
-                prob_dict[cell].prob *= r
-                
-        for cell in prob_dict:
-            prob_dict[cell].prob = 1 - prob_dict[cell].prob
+        for j in range(len(probs)):
+            probs[j] = 1 - probs[j]
             
         # Check if any mines/safe tiles can be identified
         certain_move_found = False
-        for cell in prob_dict:
-            if prob_dict[cell] == 0:
+        for cell, j in cell_index.items():
+            # (probabilities are floats: compare them with a small tolerance)
+            if probs[j] < 1e-12:
                 self.mark_safe(cell)
                 certain_move_found = True
                 
-            elif prob_dict[cell] == 1:
+            elif probs[j] > 1 - 1e-12:
                 self.mark_mine(cell)
+        
+        # Safe moves are found: no need to estimate the risk of uncertain ones
+        if certain_move_found:
+            return
                 
         # Recalculating probability in a constraint such that sum of all probability equals to
         # corresponding sentence's mine count while maintaining ratio of mine probability of 
@@ -447,22 +657,17 @@ class ProbabilityTheorySolver(ProbabilitySolver):
         # Mine probability of a tile in every constraint must be the same, so the process is
         # repeated for a number of times for every constraint to make all probabilities in these
         # converges to certain numbers.
-        if not certain_move_found:
-            for _ in range(30):
-                for i in range(len(self.knowledge)):
-                    if self.knowledge[i].count == 0:
-                        norm = 1
-                    else:
-                        norm = self.knowledge[i].count / sum(cell.prob for cell in constraint_list[i])
-                        
-                    for cell in constraint_list[i]:
-                        cell.prob *= norm
-            
-            # calculating move risk and decide the tile to reveal
-            best_informed_move = min(prob_dict, key = lambda cell: prob_dict[cell].prob)
-            best_informed_move_risk = prob_dict[best_informed_move].prob
-            
-            self.choose_uncertain_move(best_informed_move, best_informed_move_risk, prob_dict)
+        for _ in range(30):
+            for count, prob_constraint in constraint_list:
+                norm = count / sum(map(probs.__getitem__, prob_constraint))
+                for j in prob_constraint:
+                    probs[j] *= norm
+        
+        # calculating move risk and decide the tile to reveal
+        best_informed_move = min(cell_index, key = lambda cell: probs[cell_index[cell]])
+        best_informed_move_risk = probs[cell_index[best_informed_move]]
+        
+        self.choose_uncertain_move(best_informed_move, best_informed_move_risk, cell_index)
             
 
 class SetBasedSolver(Solver):
@@ -470,33 +675,53 @@ class SetBasedSolver(Solver):
     Solver that solve the board as a constraint satisfaction problem.
     Can use method from another ProbabilitySolver class to make uncertain move.
     '''
+    __slots__ = ('guess_method',)
+    
     def __init__(self, width, height, amount_mines, guess_method, print_progress = True):
         super().__init__(width, height, amount_mines, print_progress)
         
         # Guess method: 1: Generate all possible configurations, 2: Probability theory
         self.guess_method = guess_method
     
+    def is_settled(self):
+        '''
+        Never settled: the complement and intersection passes can still find something new
+        in sentences that check_sentence is done with.
+        '''
+        return False
+    
     def add_complement_sentence(self):
         '''
         Check if one sentence's cell set is a subset of another one,
         and update new sentence based on the complement of two cell set.
         Example: {(0, 1), (0, 2), (0, 3)} = 2, {(0, 1), (0, 2)} = 1 ==> {(0, 3)} = 1 
         '''
-        for i in range(len(self.knowledge) - 1):
-            for j in range(i + 1, len(self.knowledge)):
-                s1 = self.knowledge[i]
+        # Only sentences sharing a tile can be subsets of one another: the pairs are taken from
+        # the tile -> sentences index, in the order of the knowledge
+        position = {id(sentence): i for i, sentence in enumerate(self.knowledge)}
+        
+        for i, s1 in enumerate(self.knowledge):
+            candidates = set()
+            for cell in s1.cells:
+                candidates.update(self.cell_to_sentences[cell])
+            candidates.discard(id(s1))
+            if not candidates:
+                continue
+                
+            for j in sorted(position[sentence_id] for sentence_id in candidates):
+                if j < i:
+                    continue
                 s2 = self.knowledge[j]
                 
                 # New sentence will have mine count = difference of two sentence' mine count
+                # (subsets are checked on the bitmasks of the cell sets)
                 if s1.count >= s2.count:
-                    if s1.cells.issuperset(s2.cells):
-                        s1.cells.difference_update(s2.cells)
-                        s1.count -= s2.count
+                    if s1._mask & s2._mask == s2._mask:
+                        self._subtract_sentence(s1, s2)
                         
                 if s1.count <= s2.count:
-                    if s1.cells.issubset(s2.cells):
-                        s2.cells.difference_update(s1.cells)
-                        s2.count -= s1.count
+                    if s1._mask & s2._mask == s1._mask:
+                        self._subtract_sentence(s2, s1)
                         
     def add_intersection_sentence(self):
         '''
@@ -505,58 +730,45 @@ class SetBasedSolver(Solver):
         Example: {(0, 1), (0, 2), (0, 3)} = 2, {(0, 2), (0, 3), (0, 4)} = 1
         ==> {(0, 1)} - {(0, 4)} = 1 ==> (0, 1) is mine and (0, 4) is safe ==> {(0, 2), (0, 3)} = 1
         '''
-        remove_set = set()
-        for i in range(len(self.knowledge) - 1):
-            for j in range(i + 1, len(self.knowledge)):
-                if self.knowledge[i].count >= self.knowledge[j].count:
-                    s1 = self.knowledge[i]
-                    s2 = self.knowledge[j]
-                    
-                else:
-                    s1 = self.knowledge[j]
-                    s2 = self.knowledge[i]   
-                     
-                sub12 = s1.cells - s2.cells
+        # Pairs are taken among the sentences known before the call: new sentences are paired on the next one
+        for s1, s2 in combinations(self.knowledge, 2):
+            if s1.count < s2.count:
+                s1, s2 = s2, s1
+                 
+            sub12 = s1.cells - s2.cells
+            
+            # New sentence will have the set cell = intersection of two sentences' cell set
+            # and mine count = difference of two sentence' mine count
+            if s1.count - s2.count == len(sub12):
+                for cell in sub12:
+                    self.mark_mine(cell)
                 
-                # New sentence will have the set cell = intersection of two sentences' cell set
-                # and mine count = difference of two sentence' mine count
-                if s1.count - s2.count == len(sub12):
-                    for cell in sub12:
-                        self.mark_mine(cell)
+                sub21 = s2.cells - s1.cells
+                for cell in sub21:
+                    self.mark_safe(cell)
                     
-                    sub21 = s2.cells - s1.cells
-                    for cell in sub21:
-                        self.mark_safe(cell)
-                        
-                    self.knowledge.append(Sentence(s1.cells.intersection(s2.cells), s2.count))
-                    
-                    # Add old sentences to remove set
-                    remove_set.add(i)
-                    remove_set.add(j)
+                new_sentence = Sentence(s1.cells.intersection(s2.cells), s2.count, s1._mask & s2._mask)
+                self.knowledge.append(new_sentence)
+                self._index_sentence(new_sentence)
+                
+                # Old sentences are removed once every pair is checked
+                s1._dead = True
+                s2._dead = True
         
         # Remove old sentence            
-        for pos in sorted(remove_set, reverse = True):
-            del self.knowledge[pos]
+        for sentence in self.knowledge:
+            if sentence._dead:
+                self._unindex_sentence(sentence)
+                
+        self.knowledge[:] = [sentence for sentence in self.knowledge if not sentence._dead]
     
-    def add_knowledge(self, cell, count):
+    def update_knowledge(self):
         '''
         Actions made:
-        1. Mark previously revealed tile as safe and record new move.
-        2. Add new sentence based on information about previous move.
-        3. Check if new mines/safe tiles can be identified from individual sentence.
-        4. Check if new sentence can be made from old ones.
-        5. Remove unnecessary sentence.
+        1. Check if new mines/safe tiles can be identified from individual sentence.
+        2. Check if new sentence can be made from old ones.
+        3. Remove unnecessary sentence.
         '''
-        # Mark previously revealed tile as safe and record new move
-        self.moves_made.add(cell)
-        self.mark_safe(cell)
-        
-        if count == 0:
-            return
-        
-        # Add new sentence based on information about previous move
-        self.add_sentence(cell, count)
-        
         # Check if new sentence can be made from old ones
         # Remove unnecessary sentence
         self.remove_null_sentence()
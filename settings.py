@@ -1,50 +1,73 @@
 import pygame 
 import os
-
-# Background Color
-BGCOLOR = (40, 40, 40) # Dark Grey
+import functools
+from dataclasses import dataclass
+from types import SimpleNamespace
 
 # Game Setting
 TILESIZE = 30
 FPS = 60
 TITLE = "Minesweeper"
-ROWS, COLS, AMOUNT_MINES = 16, 30, 99
-WIDTH = TILESIZE * COLS
-HEIGHT = TILESIZE * ROWS
 
-def difficulty_settings(mode):
-    global ROWS, COLS, AMOUNT_MINES, WIDTH, HEIGHT
+@dataclass(frozen = True)
+class GameConfig:
+    '''Board size and number of mines of a game.'''
+    rows: int
+    cols: int
+    mines: int
+    tile_size: int = TILESIZE
+    
+    @property
+    def width(self):
+        return self.tile_size * self.cols
+    
+    @property
+    def height(self):
+        return self.tile_size * self.rows
+
+def make_config(mode):
+    '''Game configuration of a difficulty (1: beginner, 2: intermediate, 3: expert).'''
     if mode == 1:
-        ROWS = 10
-        COLS = 10
-        AMOUNT_MINES = 10
+        return GameConfig(rows = 10, cols = 10, mines = 10)
         
     elif mode == 2:
-        ROWS = 16
-        COLS = 16
-        AMOUNT_MINES = 40
+        return GameConfig(rows = 16, cols = 16, mines = 40)
         
     elif mode == 3:
-        ROWS = 16
-        COLS = 30
-        AMOUNT_MINES = 99
-        
-    WIDTH = TILESIZE * COLS
-    HEIGHT = TILESIZE * ROWS
-
-# Create Different Tiles Image
-tile_numbers = []
-for i in range(1, 9):
-    tile_numbers.append(pygame.transform.scale(pygame.image.load(os.path.join("assets", f"Tile{i}.png")), (TILESIZE, TILESIZE)))
-tile_empty = pygame.transform.scale(pygame.image.load(os.path.join("assets", "TileEmpty.png")), (TILESIZE, TILESIZE))
-tile_exploded = pygame.transform.scale(pygame.image.load(os.path.join("assets", "TileExploded.png")), (TILESIZE, TILESIZE))
-tile_flag = pygame.transform.scale(pygame.image.load(os.path.join("assets", "TileFlag.png")), (TILESIZE, TILESIZE))
-tile_mine = pygame.transform.scale(pygame.image.load(os.path.join("assets", "TileMine.png")), (TILESIZE, TILESIZE))
-tile_unknown = pygame.transform.scale(pygame.image.load(os.path.join("assets", "TileUnknown.png")), (TILESIZE, TILESIZE))
-tile_not_mine = pygame.transform.scale(pygame.image.load(os.path.join("assets", "TileNotMine.png")), (TILESIZE, TILESIZE))
+        return GameConfig(rows = 16, cols = 30, mines = 99)
+
+DEFAULT_CONFIG = make_config(3)
+
+def display_format(image):
+    '''Convert an opaque image to the pixel format of the window (if one is open) so that it is blitted without conversion.'''
+    if pygame.display.get_surface() is not None:
+        return image.convert()
+    return image
+
+def load_tile(name, tile_size = TILESIZE):
+    '''Load a tile image scaled to the tile size.'''
+    return display_format(pygame.transform.scale(pygame.image.load(os.path.join("assets", name)), (tile_size, tile_size)))
+
+# Create Different Tiles Image (loaded on first use, not when settings is imported:
+# games open their window first, so the images get the window's pixel format), one set per tile size
+@functools.lru_cache(maxsize = None)
+def load_tiles(tile_size = TILESIZE):
+    return SimpleNamespace(
+        numbers = [load_tile(f"Tile{i}.png", tile_size) for i in range(1, 9)],
+        empty = load_tile("TileEmpty.png", tile_size),
+        exploded = load_tile("TileExploded.png", tile_size),
+        flag = load_tile("TileFlag.png", tile_size),
+        mine = load_tile("TileMine.png", tile_size),
+        unknown = load_tile("TileUnknown.png", tile_size),
+        not_mine = load_tile("TileNotMine.png", tile_size),
+    )
 
 # Menu Settings
-BG = pygame.image.load("assets/Background.png")
+@functools.lru_cache(maxsize = None)
+def load_background():
+    return display_format(pygame.image.load("assets/Background.png"))
 
+# Each font size is loaded once
+@functools.lru_cache(maxsize = 16)
 def get_font(size):
     return pygame.font.Font("assets/font.ttf", size)
\ No newline at end of file
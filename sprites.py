@@ -1,5 +1,7 @@
 import pygame
 import random
+import functools
+from collections import deque
 import settings
 
 # Types:
@@ -8,14 +10,30 @@ import settings
 # "C": Clue
 # "/": empty
 
+@functools.lru_cache(maxsize = None)
+def neighbour_indices(cols, rows):
+    '''Indices of the adjacent tiles of every tile (tile (x, y) is index x*rows + y), indexed by tile.'''
+    return tuple(tuple(nx * rows + ny for nx in range(max(0, x-1), min(cols-1, x+1)+1)
+                       for ny in range(max(0, y-1), min(rows-1, y+1)+1) if (nx, ny) != (x, y))
+                 for x in range(cols) for y in range(rows))
+
+@functools.lru_cache(maxsize = None)
+def neighbour_cells(cols, rows):
+    '''Coordinates of the adjacent tiles of every tile, indexed [x][y].'''
+    indices = neighbour_indices(cols, rows)
+    return [[tuple(divmod(i, rows) for i in indices[x * rows + y]) for y in range(rows)] for x in range(cols)]
+
 class Tile:
     '''
     A small square which contains mine or information about adjacent tiles.
     Base unit of Minesweeper game.
     '''
-    def __init__(self, x, y, image, tile_type, nearby_mine = 0, revealed=False, flagged=False):
+    __slots__ = ('x', 'y', 'pos', 'image', 'type', 'nearby_mine', 'revealed', 'flagged', 'drawn')
+    
+    def __init__(self, x, y, image, tile_type, tile_size, nearby_mine = 0, revealed=False, flagged=False):
         # Tile coordinate
-        self.x, self.y = x * settings.TILESIZE, y * settings.TILESIZE
+        self.x, self.y = x * tile_size, y * tile_size
+        self.pos = (self.x, self.y)
         
         # Tile type and number of adjacent mines
         self.image = image
@@ -25,20 +43,27 @@ class Tile:
         # Tile state
         self.revealed = revealed
         self.flagged = flagged
+        
+        # Image currently drawn on the board surface
+        self.drawn = None
 
-    def draw(self, board_surface):
-        '''Draw the tile on the screen.'''
-        # if not flagged and revealed -> draw the tile over the board
-        if not self.flagged and self.revealed:
-            board_surface.blit(self.image, (self.x, self.y))
-            
-        # if flagged and not already revealed -> draw the flag over the board
-        elif self.flagged and not self.revealed:
-            board_surface.blit(settings.tile_flag, (self.x, self.y))
+    def blit_args(self, tiles):
+        '''Return the (image, position) to blit if the tile's image changed (None if unchanged), and record it as drawn.'''
+        if self.revealed:
+            # if not flagged and revealed -> draw the tile over the board
+            if self.flagged:
+                return None
+            image = self.image
             
-        # unknown tiles
-        elif not self.revealed:
-            board_surface.blit(settings.tile_unknown, (self.x, self.y))
+        # if flagged and not already revealed -> draw the flag over the board, else unknown tile
+        else:
+            image = tiles.flag if self.flagged else tiles.unknown
+        
+        if image is self.drawn:
+            return None
+        
+        self.drawn = image
+        return image, self.pos
         
 
 class Board:
@@ -46,99 +71,199 @@ class Board:
     Rectangle board containing Tiles.
     Main component of a Minesweeper games.
     '''
-    def __init__(self):
-        self.board_surface = pygame.Surface((settings.WIDTH, settings.HEIGHT))
+    __slots__ = ('config', 'board_surface', 'unknown_surface', 'tiles', 'rng', 'board_list', 'tile_list', 'first_click', 'redraw', 'changed', 'mines', 'flags', 'mine_bits', 'unrevealed_safe')
+    
+    def __init__(self, config = settings.DEFAULT_CONFIG, rng = random):
+        # Board size and number of mines
+        self.config = config
+        
+        self.board_surface = pygame.Surface((config.width, config.height))
+        
+        # Tile images
+        self.tiles = settings.load_tiles(config.tile_size)
+        
+        # Random number generator used to place mines (a seeded random.Random replays a game)
+        self.rng = rng
         
         # Create a board matrix with Tile object
-        self.board_list = [[Tile(col, row, settings.tile_empty, ".") for row in range(settings.ROWS)] for col in range(settings.COLS)]
+        self.board_list = [[Tile(col, row, self.tiles.empty, ".", config.tile_size) for row in range(config.rows)] for col in range(config.cols)]
+        
+        # The same Tile objects in one flat list: tile (x, y) is index x*rows + y, as in the mine bitboard
+        self.tile_list = [tile for column in self.board_list for tile in column]
+        
+        # Board with every tile unknown, drawn once: a new game starts from a copy of it
+        self.unknown_surface = pygame.Surface((config.width, config.height))
+        for tile in self.tile_list:
+            self.unknown_surface.blit(self.tiles.unknown, tile.pos)
         
         # First click made or not
         self.first_click = False
         
-        # List of revealed tiles
-        self.dug = []
+        # The whole board must be drawn on the screen on the first frame (and after the window was covered)
+        self.redraw = True
+        
+        # Tiles whose state changed since the last frame
+        self.changed = []
+        
+        # Mine tiles and coordinates of flagged tiles, used to reveal the board after a loss
+        self.mines = []
+        self.flags = set()
+        
+        # Bitboard of the mines: bit x*rows + y is set if tile (x, y) is a mine
+        self.mine_bits = 0
+        
+        # Number of hidden tiles that are not mines, the game is won when it reaches 0
+        self.unrevealed_safe = config.cols * config.rows - config.mines
+
+    def reset_in_place(self, rng = random):
+        '''Turn the board back into a new game, reusing its surface and Tile objects.'''
+        self.rng = rng
+        
+        for tile in self.tile_list:
+            tile.image = self.tiles.empty
+            tile.type = "."
+            tile.nearby_mine = 0
+            tile.revealed = False
+            tile.flagged = False
+        
+        self.first_click = False
+        self.redraw = True
+        self.changed = []
+        self.mines = []
+        self.flags = set()
+        self.mine_bits = 0
+        self.unrevealed_safe = self.config.cols * self.config.rows - self.config.mines
 
     def place_mines(self, fcx, fcy):
         '''Place mines on random tiles on the board.'''
-        # Place mines
-        for _ in range(settings.AMOUNT_MINES):
-            # Loop to avoid duplicates
-            while True:
-                # get random pos for mines
-                x = random.randint(0, settings.COLS-1)
-                y = random.randint(0, settings.ROWS-1)
-                
-                # if tile is blank and its position is different from first click position -> create a mine tile
-                if self.board_list[x][y].type == "." and (x,y) != (fcx, fcy):
-                    self.board_list[x][y].image = settings.tile_mine
-                    self.board_list[x][y].type = "X"
-                    break
+        # Draw distinct tiles among all but the first click position (tile (x, y) is index x*rows + y):
+        # indices from the first click onwards are shifted by one to skip it
+        first_click = fcx * self.config.rows + fcy
+        for i in self.rng.sample(range(len(self.tile_list) - 1), self.config.mines):
+            if i >= first_click:
+                i += 1
+            
+            tile = self.tile_list[i]
+            tile.image = self.tiles.mine
+            tile.type = "X"
+            self.mines.append(tile)
+            self.mine_bits |= 1 << i
 
     def place_clues(self):
         '''Check and set the number of adjacent mines to tiles that are not mines.'''
-        for x in range(settings.COLS):
-            for y in range(settings.ROWS):
-                if self.board_list[x][y].type != "X":
-                    # get clues number based on adjecent mines
-                    total_mines = self.check_neighbours(x, y)
-                    
-                    if total_mines > 0:
-                        self.board_list[x][y].image = settings.tile_numbers[total_mines - 1]
-                        self.board_list[x][y].type = "C"
-                        self.board_list[x][y].nearby_mine = total_mines
+        neighbours = neighbour_indices(self.config.cols, self.config.rows)
+        
+        # every mine adds one to the count of the tiles around it (tile (x, y) is index x*rows + y)
+        nearby_mines = [0] * len(neighbours)
+        bits = self.mine_bits
+        while bits:
+            low = bits & -bits
+            bits ^= low
+            for i in neighbours[low.bit_length() - 1]:
+                nearby_mines[i] += 1
+        
+        for tile, total_mines in zip(self.tile_list, nearby_mines):
+            if total_mines > 0 and tile.type != "X":
+                tile.image = self.tiles.numbers[total_mines - 1]
+                tile.type = "C"
+                tile.nearby_mine = total_mines
                         
-    @staticmethod
-    def is_inside(x, y):
-        '''Check if given coordinate is inside the board.'''
-        return 0 <= x < settings.COLS and 0 <= y < settings.ROWS
-
-    def check_neighbours(self, x, y):
-        '''Check number of adjacent mines to a tile.'''
-        total_mines = 0
-        # get neighbours coordinates
-        for x_offset in range(-1, 2):
-            for y_offset in range(-1, 2):
-                neighbour_x = x + x_offset
-                neighbour_y = y + y_offset
+    def reveal_mines(self):
+        '''Reveal all mines and wrong flags after a mine is dug.'''
+        for x, y in self.flags:
+            tile = self.board_list[x][y]
+            if tile.flagged and tile.type != "X":
+                tile.flagged = False
+                tile.revealed = True
+                tile.image = self.tiles.not_mine
+                self.changed.append(tile)
                 
-                # if inside the box and is a mine -> count mines
-                if self.is_inside(neighbour_x, neighbour_y) and self.board_list[neighbour_x][neighbour_y].type == "X":
-                    total_mines += 1
-                    
-        return total_mines 
-    
+        for tile in self.mines:
+            tile.revealed = True
+        self.changed.extend(self.mines)
+        
+    def toggle_flag(self, x, y):
+        '''Flag or unflag a hidden tile.'''
+        tile = self.board_list[x][y]
+        if not tile.revealed:
+            tile.flagged = not tile.flagged
+            self.flags ^= {(x, y)}
+            self.changed.append(tile)
+            
+    def flag_mines(self):
+        '''Flag all mines after a win (the only tiles left unrevealed).'''
+        for tile in self.mines:
+            tile.flagged = True
+        self.changed.extend(self.mines)
+            
     def draw(self, screen):
-        '''Display the game board on the screen.'''
-        # draw a blank board
-        for row in self.board_list:
-            for tile in row:
-                tile.draw(self.board_surface)
-                
-        screen.blit(self.board_surface, (0, 0))
+        '''Display the game board on the screen, return the changed areas (the whole board if it is redrawn).'''
+        if self.redraw:
+            # start from the pre-drawn unknown tiles, the other tiles are drawn over them below
+            self.board_surface.blit(self.unknown_surface, (0, 0))
+            for tile in self.tile_list:
+                tile.drawn = self.tiles.unknown
+            self.changed.extend(self.tile_list)
+        
+        # draw the tiles that changed since the last frame, in one call
+        blits = []
+        for tile in self.changed:
+            args = tile.blit_args(self.tiles)
+            if args is not None:
+                blits.append(args)
+        self.changed.clear()
+        rects = self.board_surface.blits(blits)
+        
+        if self.redraw:
+            self.redraw = False
+            return [screen.blit(self.board_surface, (0, 0))]
+        
+        screen.blits([(self.board_surface, rect, rect) for rect in rects])
+        return rects
 
     def dig(self, x, y, ai = None):
         '''Reveal tiles types after chosen.'''
+        # Local names for the board's lookups used in the loop below
+        board_list = self.board_list
+        changed = self.changed
+        
         # Dig the chosen tile
-        self.dug.append((x, y))
-        self.board_list[x][y].revealed = True
+        tile = board_list[x][y]
+        if not tile.revealed and tile.type != "X":
+            self.unrevealed_safe -= 1
+        tile.revealed = True
+        changed.append(tile)
         
         # If a mine is dug -> dig = False -> Game Over
-        if self.board_list[x][y].type == "X":
-            self.board_list[x][y].image = settings.tile_exploded
+        if tile.type == "X":
+            tile.image = self.tiles.exploded
             return False
         
-        # Provide information for agent if used
+        # Reveal empty tiles (breadth first) until clue tiles are revealed
+        neighbours = neighbour_cells(self.config.cols, self.config.rows)
+        queue = deque([(x, y)])
+        revealed = []
+        while queue:
+            x, y = queue.popleft()
+            tile = board_list[x][y]
+            revealed.append(((x, y), tile.nearby_mine))
+            
+            # Reveal clues
+            if tile.type == "C":
+                continue
+            
+            # Reveal empty tiles (a tile is revealed when it is queued, so it is queued once)
+            for row, col in neighbours[x][y]:
+                neighbour = board_list[row][col]
+                if not neighbour.revealed:
+                    neighbour.revealed = True
+                    changed.append(neighbour)
+                    queue.append((row, col))
+        
+        # Every queued tile but the first one was revealed by the fill
+        self.unrevealed_safe -= len(revealed) - 1
+        
+        # Provide information for agent if used, once for the whole move
         if ai != None:
-            ai.add_knowledge((x, y), self.board_list[x][y].nearby_mine)
-        
-        # Reveal clues
-        if self.board_list[x][y].type == "C":
-            return True
-        
-        # Reveal empty tiles
-        for row in range(max(0, x-1), min(settings.COLS-1, x+1)+1):
-            for col in range(max(0, y-1), min(settings.ROWS-1, y+1)+1):
-                if (row, col) not in self.dug:
-                    # Recursively reveal empty tiles until a clue tile is revealed
-                    self.dig(row, col, ai = ai)
+            ai.add_knowledge_batch(revealed)
         return True
\ No newline at end of file